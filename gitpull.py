@@ -13,16 +13,31 @@ Usage:
 """
 
 import argparse
-import configparser
-import json
 import os
 import re
-import shutil
 import sys
-import tempfile
-import urllib.request
-import zipfile
-from urllib.error import HTTPError, URLError
+
+# Heavier modules (json, zipfile, urllib, ...) are imported inside the
+# functions that use them so quick invocations start fast.
+
+
+# Repository argument formats, all in one pattern (see parse_repo_arg):
+# https://github.com/owner/repo, github.com/owner/repo and owner/repo
+_REPO_ARG_RE = re.compile(r'^(?:https?://github\.com/|github\.com/)?([^/]+)/([^/]+)$')
+
+# Remote URL formats (see parse_github_url)
+_HTTPS_URL_RE = re.compile(r'https?://github\.com/([^/]+)/([^/]+)$')
+_SSH_RE = re.compile(r'git@github\.com:([^/]+)/([^/]+)$')
+
+# "default_branch" value in a repo API response, without JSON escapes
+# (see get_default_branch)
+_DEFAULT_BRANCH_RE = re.compile(rb'"default_branch"\s*:\s*"([^"\\]+)"')
+
+
+def _normalize(url):
+    """Strip trailing slashes and a .git suffix from a repository URL."""
+    url = url.rstrip('/')
+    return url[:-4].rstrip('/') if url.endswith('.git') else url
 
 
 def parse_repo_arg(arg):
@@ -35,26 +50,9 @@ def parse_repo_arg(arg):
     - https://github.com/owner/repo
     - https://github.com/owner/repo.git
     """
-    # Strip trailing slashes and .git suffix
-    arg = arg.rstrip('/')
-    if arg.endswith('.git'):
-        arg = arg[:-4]
-
-    # Full URL: https://github.com/owner/repo
-    https_pattern = r'^https?://github\.com/([^/]+)/([^/]+)$'
-    match = re.match(https_pattern, arg)
-    if match:
-        return match.group(1), match.group(2)
-
-    # URL without protocol: github.com/owner/repo
-    domain_pattern = r'^github\.com/([^/]+)/([^/]+)$'
-    match = re.match(domain_pattern, arg)
-    if match:
-        return match.group(1), match.group(2)
+    arg = _normalize(arg)
 
-    # Simple format: owner/repo
-    simple_pattern = r'^([^/]+)/([^/]+)$'
-    match = re.match(simple_pattern, arg)
+    match = _REPO_ARG_RE.match(arg)
     if match:
         return match.group(1), match.group(2)
 
@@ -64,13 +62,16 @@ def parse_repo_arg(arg):
 
 def get_remote_url():
     """Parse .git/config for the origin remote URL."""
-    git_config_path = os.path.join('.git', 'config')
+    import configparser
 
-    if not os.path.exists(git_config_path):
-        raise FileNotFoundError("Not a git repository (no .git/config found)")
+    git_config_path = os.path.join('.git', 'config')
 
     config = configparser.ConfigParser()
-    config.read(git_config_path)
+    try:
+        with open(git_config_path, 'r', encoding='utf-8') as f:
+            config.read_file(f)
+    except FileNotFoundError:
+        raise FileNotFoundError("Not a git repository (no .git/config found)")
 
     # Look for [remote "origin"] section
     section = 'remote "origin"'
@@ -94,15 +95,15 @@ def parse_github_url(url):
     - git@github.com:owner/repo.git
     - git@github.com:owner/repo
     """
-    # HTTPS format: https://github.com/owner/repo.git or https://github.com/owner/repo
-    https_pattern = r'https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?$'
-    match = re.match(https_pattern, url)
+    url = _normalize(url)
+
+    # HTTPS format: https://github.com/owner/repo
+    match = _HTTPS_URL_RE.match(url)
     if match:
         return match.group(1), match.group(2)
 
-    # SSH format: git@github.com:owner/repo.git or git@github.com:owner/repo
-    ssh_pattern = r'git@github\.com:([^/]+)/([^/]+?)(?:\.git)?$'
-    match = re.match(ssh_pattern, url)
+    # SSH format: git@github.com:owner/repo
+    match = _SSH_RE.match(url)
     if match:
         return match.group(1), match.group(2)
 
@@ -111,6 +112,10 @@ def parse_github_url(url):
 
 def get_default_branch(owner, repo):
     """Call GitHub API to get the default branch name."""
+    import json
+    import urllib.request
+    from urllib.error import HTTPError, URLError
+
     api_url = f"https://api.github.com/repos/{owner}/{repo}"
 
     request = urllib.request.Request(
@@ -120,8 +125,14 @@ def get_default_branch(owner, repo):
 
     try:
         with urllib.request.urlopen(request, timeout=30) as response:
-            data = json.loads(response.read().decode('utf-8'))
-            return data['default_branch']
+            body = response.read()
+        # Only one field is needed, so find it without parsing the whole
+        # response. Forks also embed their parent's default_branch; with
+        # more than one match, leave it to json.
+        matches = _DEFAULT_BRANCH_RE.findall(body)
+        if len(matches) == 1:
+            return matches[0].decode('utf-8')
+        return json.loads(body)['default_branch']
     except HTTPError as e:
         if e.code == 404:
             raise ValueError(f"Repository {owner}/{repo} not found (or is private)")
@@ -132,7 +143,12 @@ def get_default_branch(owner, repo):
 
 def download_zip(owner, repo, branch):
     """Download zip archive to a temp location and return the path."""
-    zip_url = f"https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"
+    import shutil
+    import tempfile
+    import urllib.request
+    from urllib.error import HTTPError, URLError
+
+    zip_url = f"https://codeload.github.com/{owner}/{repo}/zip/refs/heads/{branch}"
 
     request = urllib.request.Request(
         zip_url,
@@ -141,12 +157,11 @@ def download_zip(owner, repo, branch):
 
     # Create temp file for the zip
     fd, zip_path = tempfile.mkstemp(suffix='.zip')
-    os.close(fd)
 
     try:
         print(f"Downloading {branch} branch...")
-        with urllib.request.urlopen(request, timeout=120) as response:
-            with open(zip_path, 'wb') as f:
+        with os.fdopen(fd, 'wb') as f:
+            with urllib.request.urlopen(request, timeout=120) as response:
                 shutil.copyfileobj(response, f)
         return zip_path
     except (HTTPError, URLError) as e:
@@ -162,52 +177,60 @@ def extract_zip(zip_path, target_dir):
     - Overwrites existing files
     - Handles the root folder in the zip (e.g., repo-branch/)
     """
+    import shutil
+    import zipfile
+
     with zipfile.ZipFile(zip_path, 'r') as zf:
         # Find the root folder name (e.g., "repo-branch/")
-        names = zf.namelist()
-        if not names:
+        infolist = zf.infolist()
+        if not infolist:
             raise ValueError("Empty zip archive")
 
         # The root folder is the common prefix
-        root_folder = names[0].split('/')[0] + '/'
-
-        extracted_count = 0
-        skipped_count = 0
-
-        for member in zf.infolist():
-            # Skip the root folder entry itself
-            if member.filename == root_folder:
-                continue
-
-            # Get the relative path (strip the root folder)
-            if not member.filename.startswith(root_folder):
-                continue
-
-            relative_path = member.filename[len(root_folder):]
-            if not relative_path:
-                continue
-
-            # Skip .git directory
-            if relative_path.startswith('.git/') or relative_path == '.git':
-                skipped_count += 1
-                continue
-
-            target_path = os.path.join(target_dir, relative_path)
-
-            # Handle directories
+        root_folder = infolist[0].filename.partition('/')[0] + '/'
+
+        # Members under the root folder (excluding the root entry itself),
+        # then the same without the .git directory
+        members = [
+            member for member in infolist
+            if member.filename.startswith(root_folder) and member.filename != root_folder
+        ]
+        git_prefix = root_folder + '.git/'
+        git_entry = root_folder + '.git'
+        entries = [
+            member for member in members
+            if not member.filename.startswith(git_prefix) and member.filename != git_entry
+        ]
+        skipped_count = len(members) - len(entries)
+
+        root_len = len(root_folder)
+        # Zip paths use '/', which open() and os.makedirs accept on every
+        # platform, so member paths are appended to one precomputed prefix
+        target_prefix = os.path.join(target_dir, '')
+        files = []
+        directories = set()
+
+        for member in entries:
+            target_path = target_prefix + member.filename[root_len:]
+
+            # Collect directories to create; explicit entries keep empty dirs
             if member.is_dir():
-                os.makedirs(target_path, exist_ok=True)
+                directories.add(target_path.rstrip('/'))
             else:
-                # Ensure parent directory exists
-                parent_dir = os.path.dirname(target_path)
-                if parent_dir:
-                    os.makedirs(parent_dir, exist_ok=True)
+                directories.add(os.path.dirname(target_path))
+                files.append((member, target_path))
+
+        # Create each directory once, parents before children
+        for directory in sorted(directories, key=len):
+            if directory:
+                os.makedirs(directory, exist_ok=True)
 
-                # Extract file
-                with zf.open(member) as source:
-                    with open(target_path, 'wb') as target:
-                        shutil.copyfileobj(source, target)
-                extracted_count += 1
+        extracted_count = 0
+        for member, target_path in files:
+            with zf.open(member) as source:
+                with open(target_path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+            extracted_count += 1
 
         print(f"Extracted {extracted_count} files")
         if skipped_count:
@@ -259,8 +282,10 @@ def main():
                 extract_zip(zip_path, target_dir)
                 print("Done!")
             finally:
-                if os.path.exists(zip_path):
+                try:
                     os.unlink(zip_path)
+                except FileNotFoundError:
+                    pass
 
         else:
             # Update mode: refresh existing repo
@@ -294,8 +319,10 @@ def main():
                 print("Done!")
             finally:
                 # Clean up temp file
-                if os.path.exists(zip_path):
+                try:
                     os.unlink(zip_path)
+                except FileNotFoundError:
+                    pass
 
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -7,16 +7,6 @@ the zip archive directly from GitHub.
 
 __version__ = "1.1.1"
 
-from .core import (
-    parse_repo_arg,
-    get_remote_url,
-    parse_github_url,
-    get_default_branch,
-    get_branches,
-    download_zip,
-    extract_zip,
-)
-
 __all__ = [
     "__version__",
     "parse_repo_arg",
@@ -24,6 +14,18 @@ __all__ = [
     "parse_github_url",
     "get_default_branch",
     "get_branches",
+    "get_repo_metadata",
     "download_zip",
+    "fetch_zip",
     "extract_zip",
+    "download_and_extract_zip",
+    "download_and_extract_tar",
 ]
+
+
+def __getattr__(name):
+    """Load the public API from .core on first access (keeps CLI startup fast)."""
+    if name in __all__:
+        from . import core
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
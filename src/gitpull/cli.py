@@ -4,25 +4,8 @@ import argparse
 import os
 import sys
 
-from .core import (
-    GITPULL_FILE,
-    VERSION_FILE,
-    parse_repo_arg,
-    read_gitpull_file,
-    write_gitpull_file,
-    read_version_file,
-    write_version_file,
-    get_remote_url,
-    parse_github_url,
-    get_default_branch,
-    get_branches,
-    get_latest_commit_sha,
-    download_zip,
-    extract_zip,
-    download_via_api,
-    bump_version,
-    poll_for_changes,
-)
+# .core is imported inside the functions that need it, so --version and
+# --help don't pay for loading the networking and archive modules.
 
 
 def select_branch(branches, default_branch=None):
@@ -71,8 +54,135 @@ def select_branch(branches, default_branch=None):
             print(f"Invalid input. Enter a number (1-{len(sorted_branches)}), branch name, or 'q' to quit.")
 
 
+def _resolve_branch(owner, repo, requested_branch):
+    """
+    Work out which branch to pull and its latest commit SHA.
+
+    Returns (branch, sha), or (None, None) if the user quits the selection.
+    The SHA decides whether there is anything to pull, so it is always
+    revalidated (max_age=0) rather than taken from the short-lived cache.
+    """
+    from .core import get_latest_commit_sha, get_repo_metadata
+
+    print("Fetching repository info...")
+
+    if requested_branch and requested_branch != '?':
+        # Use explicitly specified branch; no need for the branch list
+        branch = requested_branch
+        print(f"Using branch: {branch}")
+        return branch, get_latest_commit_sha(owner, repo, branch, max_age=0)
+
+    # Default branch, branch list and head SHA in one round-trip where possible
+    meta = get_repo_metadata(owner, repo)
+
+    if len(meta.branches) > 1:
+        # Multiple branches - show selection
+        branch = select_branch(meta.branches, meta.default_branch)
+        if branch is None:
+            return None, None
+        print(f"Selected branch: {branch}")
+    else:
+        # Only one branch (or default)
+        branch = meta.default_branch
+        print(f"Default branch: {branch}")
+
+    if branch == meta.default_branch:
+        return branch, meta.head_sha
+    return branch, get_latest_commit_sha(owner, repo, branch, max_age=0)
+
+
+def _start_prefetch(owner, repo):
+    """Start downloading the likely default branch archive in a daemon thread."""
+    import concurrent.futures
+    import threading
+
+    from .core import prefetch_default_zip
+
+    future = concurrent.futures.Future()
+
+    def _run():
+        try:
+            future.set_result(prefetch_default_zip(owner, repo))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Daemon thread: an unused prefetch must not keep the process alive
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+
+def _use_prefetched_zip(prefetch, branch, sha):
+    """Return the prefetched archive if it is for branch at sha, else None."""
+    from .core import DEFAULT_BRANCH_GUESSES, get_zip_commit
+
+    if branch not in DEFAULT_BRANCH_GUESSES:
+        return None
+
+    # The prefetch is only speculative: any failure (a dropped connection,
+    # a truncated archive, ...) just means it isn't used
+    try:
+        prefetched_branch, zip_file = prefetch.result()
+    except Exception:
+        return None
+    if zip_file is None:
+        return None
+
+    try:
+        if prefetched_branch == branch and get_zip_commit(zip_file) == sha:
+            print(f"Using prefetched {branch} archive")
+            zip_file.seek(0)
+            return zip_file
+    except Exception:
+        pass
+
+    zip_file.close()
+    return None
+
+
+def _fetch_zip_or_exit(owner, repo, branch, sha, prefetch=None):
+    """Get the branch archive, exiting with a --fallback hint if it is blocked."""
+    from .core import fetch_zip
+
+    if prefetch is not None:
+        zip_file = _use_prefetched_zip(prefetch, branch, sha)
+        if zip_file is not None:
+            return zip_file
+
+    try:
+        return fetch_zip(owner, repo, branch)
+    except RuntimeError as e:
+        _exit_with_fallback_tip(e)
+
+
+def _extract_tar_or_exit(owner, repo, branch, target_dir, include=(), exclude=()):
+    """Stream and extract the branch tarball, exiting with a --fallback hint on failure."""
+    from .core import download_and_extract_tar
+
+    try:
+        download_and_extract_tar(owner, repo, branch, target_dir, include, exclude)
+    except RuntimeError as e:
+        _exit_with_fallback_tip(e)
+
+
+def _exit_with_fallback_tip(error):
+    """Report a failed archive download and suggest --fallback."""
+    print(f"Error: {error}", file=sys.stderr)
+    print("\nTip: If archive download is blocked, try running with --fallback", file=sys.stderr)
+    print("     This will download files individually via GitHub API.", file=sys.stderr)
+    sys.exit(1)
+
+
 def _handle_watch(args):
     """Handle --watch mode: poll for changes and pull when available."""
+    from .core import (
+        read_gitpull_file,
+        get_remote_url,
+        parse_repo_arg,
+        parse_github_url,
+        get_latest_commit_sha,
+        poll_for_changes,
+    )
+
     branch = args.watch
     interval = args.interval
 
@@ -106,7 +216,8 @@ def _handle_watch(args):
         print(f"Branch '{branch}' found (at {latest_sha[:7]})")
         print()
 
-        poll_for_changes(owner, repo, branch, '.', interval, use_fallback=args.fallback)
+        poll_for_changes(owner, repo, branch, '.', interval, use_fallback=args.fallback,
+                         include=args.include, exclude=args.exclude)
 
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -132,6 +243,8 @@ def main():
                "  gitpull https://github.com/o/r     # Clone from URL\n"
                "  gitpull --init owner/repo          # Set repo URL for current dir\n"
                "  gitpull owner/repo -b develop      # Clone specific branch (skip selection)\n"
+               "  gitpull owner/repo --tar           # Stream the tar.gz archive (Linux/macOS)\n"
+               "  gitpull owner/repo --include src/  # Only pull files under src/\n"
                "  gitpull --bump                     # Bump patch version (1.0.0 -> 1.0.1)\n"
                "  gitpull --bump minor               # Bump minor version (1.0.1 -> 1.1.0)\n"
                "  gitpull -w main                    # Watch main branch, pull on changes\n"
@@ -144,7 +257,10 @@ def main():
                "commits on the specified branch and automatically pulling updates.\n"
                "\n"
                "For directories without .git, gitpull stores the repo URL in a\n"
-               ".gitpull file. If neither exists, you'll be prompted to enter one.\n",
+               ".gitpull file. If neither exists, you'll be prompted to enter one.\n"
+               "\n"
+               "Environment variables:\n"
+               "  GITHUB_TOKEN / GH_TOKEN    GitHub API token (for rate limits / private repos)\n",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument(
@@ -168,6 +284,30 @@ def main():
         action='store_true',
         help='Use API fallback to download files individually (use if zip download is blocked)'
     )
+    parser.add_argument(
+        '--tar',
+        action='store_true',
+        help='Stream and extract the tar.gz archive instead of the zip (no temp file)'
+    )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Start downloading the main/master archive while repository info is fetched'
+    )
+    parser.add_argument(
+        '--include',
+        action='append',
+        default=[],
+        metavar='PREFIX',
+        help='Only pull paths starting with PREFIX (repeatable, e.g. --include src/)'
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        metavar='PREFIX',
+        help='Skip paths starting with PREFIX (repeatable, e.g. --exclude docs/)'
+    )
     parser.add_argument(
         '-b', '--branch',
         metavar='BRANCH',
@@ -200,6 +340,7 @@ def main():
         return
 
     if args.bump:
+        from .core import bump_version
         old_ver, new_ver = bump_version(args.bump)
         print(f"Version bumped: {old_ver} -> {new_ver}")
         return
@@ -207,6 +348,21 @@ def main():
     if args.watch:
         return _handle_watch(args)
 
+    from .core import (
+        GITPULL_FILE,
+        parse_repo_arg,
+        read_gitpull_file,
+        write_gitpull_file,
+        read_version_file,
+        read_version_info,
+        write_version_file,
+        check_archive_etag,
+        get_remote_url,
+        parse_github_url,
+        extract_zip,
+        download_via_api,
+    )
+
     try:
         if args.init:
             # Init mode: save repo URL to .gitpull
@@ -224,32 +380,14 @@ def main():
             target_dir = repo
             dir_exists = os.path.exists(target_dir)
 
-            # Get default branch
-            print("Fetching repository info...")
-            default_branch = get_default_branch(owner, repo)
+            prefetch = None
+            if args.prefetch and not (args.fallback or args.tar or args.branch):
+                prefetch = _start_prefetch(owner, repo)
 
-            # Handle branch selection
-            if args.branch and args.branch != '?':
-                # Use explicitly specified branch
-                branch = args.branch
-                print(f"Using branch: {branch}")
-            else:
-                # Fetch branches to check if there are multiple
-                branches = get_branches(owner, repo)
-
-                if len(branches) > 1:
-                    # Multiple branches - show selection
-                    branch = select_branch(branches, default_branch)
-                    if branch is None:
-                        print("Aborted.")
-                        return
-                    print(f"Selected branch: {branch}")
-                else:
-                    # Only one branch (or default)
-                    branch = default_branch
-                    print(f"Default branch: {branch}")
-
-            new_sha = get_latest_commit_sha(owner, repo, branch)
+            branch, new_sha = _resolve_branch(owner, repo, args.branch)
+            if branch is None:
+                print("Aborted.")
+                return
             short_new_sha = new_sha[:7]
 
             # Check for existing version
@@ -276,27 +414,21 @@ def main():
 
             if args.fallback:
                 # Use API fallback method
-                download_via_api(owner, repo, branch, target_dir)
+                download_via_api(owner, repo, branch, target_dir,
+                                 include=args.include, exclude=args.exclude)
+            elif args.tar:
+                _extract_tar_or_exit(owner, repo, branch, target_dir, args.include, args.exclude)
             else:
                 # Try zip download
-                try:
-                    zip_path = download_zip(owner, repo, branch)
-                except RuntimeError as e:
-                    print(f"Error: {e}", file=sys.stderr)
-                    print("\nTip: If zip download is blocked, try running with --fallback", file=sys.stderr)
-                    print("     This will download files individually via GitHub API.", file=sys.stderr)
-                    sys.exit(1)
+                zip_file = _fetch_zip_or_exit(owner, repo, branch, new_sha, prefetch)
 
-                try:
-                    extract_zip(zip_path, target_dir)
-                finally:
-                    if os.path.exists(zip_path):
-                        os.unlink(zip_path)
+                with zip_file:
+                    extract_zip(zip_file, target_dir, args.include, args.exclude)
 
             # Write .gitpull file and version for future updates
             url = f"https://github.com/{owner}/{repo}"
             write_gitpull_file(url, target_dir)
-            write_version_file(new_sha, target_dir)
+            write_version_file(new_sha, target_dir, branch=branch)
             print(f"Created {GITPULL_FILE} for future updates")
             print(f"Version saved: {short_new_sha}")
             print("Done!")
@@ -340,39 +472,37 @@ def main():
             owner, repo = parse_github_url(remote_url)
             print(f"Repository: {owner}/{repo}")
 
-            # Get default branch
-            print("Fetching repository info...")
-            default_branch = get_default_branch(owner, repo)
+            # If the last pulled branch's archive is unchanged, there is
+            # nothing to do and no API request is needed to find that out.
+            # --fallback users can't reach the archive host, so don't try.
+            previous_sha, previous_branch, previous_etag = read_version_info()
+            archive_etag = None
+            if (previous_branch and not args.fallback
+                    and args.branch in (None, previous_branch)):
+                unchanged, archive_etag = check_archive_etag(owner, repo, previous_branch, previous_etag)
+                if unchanged:
+                    print(f"Warning: Already at commit {previous_sha[:7]}")
+                    print("No new commits to pull.")
+                    return
 
-            # Handle branch selection
-            if args.branch and args.branch != '?':
-                # Use explicitly specified branch
-                branch = args.branch
-                print(f"Using branch: {branch}")
-            else:
-                # Fetch branches to check if there are multiple
-                branches = get_branches(owner, repo)
-
-                if len(branches) > 1:
-                    # Multiple branches - show selection
-                    branch = select_branch(branches, default_branch)
-                    if branch is None:
-                        print("Aborted.")
-                        return
-                    print(f"Selected branch: {branch}")
-                else:
-                    # Only one branch (or default)
-                    branch = default_branch
-                    print(f"Default branch: {branch}")
-
-            new_sha = get_latest_commit_sha(owner, repo, branch)
+            prefetch = None
+            if args.prefetch and not (args.fallback or args.tar or args.branch):
+                prefetch = _start_prefetch(owner, repo)
+
+            branch, new_sha = _resolve_branch(owner, repo, args.branch)
+            if branch is None:
+                print("Aborted.")
+                return
             short_new_sha = new_sha[:7]
+            if branch != previous_branch:
+                archive_etag = None
 
             # Check for existing version
-            previous_sha = read_version_file()
             if previous_sha:
                 short_prev_sha = previous_sha[:7]
                 if previous_sha == new_sha:
+                    if archive_etag and archive_etag != previous_etag:
+                        write_version_file(new_sha, branch=branch, etag=archive_etag)
                     print(f"Warning: Already at commit {short_new_sha}")
                     print("No new commits to pull.")
                     return
@@ -382,28 +512,21 @@ def main():
 
             if args.fallback:
                 # Use API fallback method
-                download_via_api(owner, repo, branch, '.')
+                download_via_api(owner, repo, branch, '.',
+                                 include=args.include, exclude=args.exclude)
+            elif args.tar:
+                _extract_tar_or_exit(owner, repo, branch, '.', args.include, args.exclude)
             else:
                 # Try zip download
-                try:
-                    zip_path = download_zip(owner, repo, branch)
-                except RuntimeError as e:
-                    print(f"Error: {e}", file=sys.stderr)
-                    print("\nTip: If zip download is blocked, try running with --fallback", file=sys.stderr)
-                    print("     This will download files individually via GitHub API.", file=sys.stderr)
-                    sys.exit(1)
+                zip_file = _fetch_zip_or_exit(owner, repo, branch, new_sha, prefetch)
 
-                try:
+                with zip_file:
                     # Extract files
                     print("Extracting files...")
-                    extract_zip(zip_path, '.')
-                finally:
-                    # Clean up temp file
-                    if os.path.exists(zip_path):
-                        os.unlink(zip_path)
+                    extract_zip(zip_file, '.', args.include, args.exclude)
 
             # Save new version
-            write_version_file(new_sha)
+            write_version_file(new_sha, branch=branch, etag=archive_etag)
             print(f"Version saved: {short_new_sha}")
             print("Done!")
 
@@ -10,7 +10,10 @@ import subprocess
 import sys
 import zipfile
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+# Shared with gitpull: one keep-alive connection per host and thread, so the
+# many small API calls made while resolving a module reuse the same socket.
+from gitpull.core import open_url
 
 
 def get_gopath():
@@ -41,10 +44,9 @@ def github_api_get(url):
     if token:
         headers["Authorization"] = f"token {token}"
 
-    req = Request(url, headers=headers)
     try:
-        with urlopen(req) as resp:
-            return json.loads(resp.read().decode())
+        with open_url(url, headers=headers) as resp:
+            return json.load(resp)
     except HTTPError as e:
         if e.code == 403:
             print(f"  [!] Rate limited by GitHub API. Set GITHUB_TOKEN to increase limits.")
@@ -58,8 +60,7 @@ def download_url(url):
     if token:
         headers["Authorization"] = f"token {token}"
 
-    req = Request(url, headers=headers)
-    with urlopen(req) as resp:
+    with open_url(url, headers=headers, timeout=120) as resp:
         return resp.read()
 
 